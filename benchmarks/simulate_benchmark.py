@@ -0,0 +1,65 @@
+"""
+Simulation benchmark for the reminder application.
+Replays a month of recurring reminders with `--speed max` and reports how
+long it took. Every reminder is answered with "repeat", as the simulate
+command does by default, so each one fires on every occurrence.
+
+Run from the project root: python benchmarks/simulate_benchmark.py [reminders] [days]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import ReminderDatabase
+from simulator import simulate, ScriptedNotifier
+
+# Schedules benchmarked, as (label, function giving the duration of reminder i)
+SCHEDULES = (
+    ("daily hh:mm", lambda i: f"{(i // 60) % 24:02d}:{i % 60:02d}"),
+    ("every 8h", lambda i: "8h"),
+    ("every 1h", lambda i: "1h"),
+)
+
+
+def populate(db_path, reminders, start, duration_for):
+    """Create a database of recurring reminders spread over the first day."""
+    db = ReminderDatabase(db_path)
+    updated_at = start.strftime('%Y-%m-%d %H:%M:%S.%f')
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany('''
+            INSERT INTO reminders (message, scheduled_time, duration, uuid, updated_at, version, origin, change_seq)
+            VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+        ''', (
+            (f"Reminder {i}", (start + timedelta(seconds=(i * 86400) // reminders)).strftime('%Y-%m-%d %H:%M:%S'),
+             duration_for(i), uuid.uuid4().hex, updated_at, db.site_id, i + 1)
+            for i in range(reminders)
+        ))
+
+
+def main():
+    reminders = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    start = datetime(2026, 1, 1, 0, 0, 0)
+    end = start + timedelta(days=days)
+    print(f"{reminders} recurring reminders over {days} days\n")
+
+    for label, duration_for in SCHEDULES:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "reminders.db")
+            populate(db_path, reminders, start, duration_for)
+
+            started = time.perf_counter()
+            timeline = simulate(db_path, start, end, ScriptedNotifier("repeat"))
+            elapsed = time.perf_counter() - started
+            print(f"{label:<12} {len(timeline):>9} firings {elapsed:>8.2f} s "
+                  f"({len(timeline) / elapsed:>8.0f} firings/s)")
+
+
+if __name__ == "__main__":
+    main()
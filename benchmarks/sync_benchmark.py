@@ -0,0 +1,75 @@
+"""
+Sync benchmark for the reminder application.
+Builds two local reminder databases of 100k reminders each, syncs them once
+in full, then measures how long a sync takes for a small number of changes
+on each side. The incremental sync time should not depend on the store size.
+
+Run from the project root: python benchmarks/sync_benchmark.py [rows] [changes]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import ReminderDatabase
+from sync import sync_databases
+
+
+def populate(db, rows, start):
+    """Bulk insert reminders created by this database's site."""
+    updated_at = start.strftime('%Y-%m-%d %H:%M:%S.%f')
+    with sqlite3.connect(db.db_path) as conn:
+        first_seq = conn.execute("SELECT COALESCE(MAX(change_seq), 0) FROM reminders").fetchone()[0] + 1
+        conn.executemany('''
+            INSERT INTO reminders (message, scheduled_time, duration, uuid, updated_at, version, origin, change_seq)
+            VALUES (?, ?, '1h', ?, ?, 1, ?, ?)
+        ''', (
+            (f"Reminder {i}", (start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'),
+             uuid.uuid4().hex, updated_at, db.site_id, first_seq + i)
+            for i in range(rows)
+        ))
+
+
+def change(db, count, offset):
+    """Snooze and remove a few reminders through the normal database methods."""
+    ids = [row[0] for row in db.get_all_reminders()[offset:offset + count]]
+    for i, rid in enumerate(ids):
+        if i % 2:
+            db.remove_reminder(rid)
+        else:
+            db.update_reminder_status(rid, "snoozed")
+
+
+def timed_sync(label, laptop, workstation):
+    started = time.perf_counter()
+    pulled, pushed = sync_databases(laptop, workstation)
+    print(f"{label:<32} {time.perf_counter() - started:>8.3f} s   received {pulled:>6}   sent {pushed:>6}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    start = datetime(2026, 1, 1, 9, 0, 0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        laptop = ReminderDatabase(os.path.join(tmp_dir, "laptop.db"))
+        workstation = ReminderDatabase(os.path.join(tmp_dir, "workstation.db"))
+        populate(laptop, rows, start)
+        populate(workstation, rows, start)
+        print(f"Two databases of {rows} reminders each\n")
+
+        timed_sync("Initial full sync", laptop, workstation)
+        timed_sync("Sync with no changes", laptop, workstation)
+        change(laptop, changes, 0)
+        change(workstation, changes, changes)
+        timed_sync(f"Sync after {changes} changes per side", laptop, workstation)
+        timed_sync("Sync with no changes", laptop, workstation)
+
+
+if __name__ == "__main__":
+    main()
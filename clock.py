@@ -0,0 +1,52 @@
+"""
+Clock module for the reminder application.
+Provides the source of "now" and the sleep used by the daemon, so that the
+scheduler can be driven by a virtual clock during simulations.
+"""
+import time
+from datetime import datetime, timedelta
+
+
+class SystemClock:
+    """Clock backed by the real wall time."""
+
+    def now(self):
+        """Return the current local time."""
+        return datetime.now()
+
+    def sleep(self, seconds):
+        """Block for the given number of seconds."""
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Clock whose time only moves when it is told to.
+
+    Sleeping advances the virtual time instantly. When a speed factor is
+    given, sleeping also waits seconds / speed of real time, so that a
+    simulation can be watched at e.g. 60x instead of running flat out.
+    """
+
+    def __init__(self, start, speed=None):
+        """Initialize the clock at the given start datetime."""
+        self._now = start
+        self.speed = speed
+
+    def now(self):
+        """Return the current virtual time."""
+        return self._now
+
+    def sleep(self, seconds):
+        """Advance the virtual time by the given number of seconds."""
+        if self.speed:
+            time.sleep(seconds / self.speed)
+        self._now += timedelta(seconds=seconds)
+
+    def advance_to(self, moment):
+        """Move the virtual time forward to the given datetime (never backwards)."""
+        if moment > self._now:
+            self._now = moment
+
+
+# Clock used when a caller does not inject one
+system_clock = SystemClock()
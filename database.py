@@ -4,43 +4,195 @@ Handles SQLite database operations for storing and managing reminders.
 """
 import sqlite3
 import os
-from datetime import datetime
 import re
+import uuid
+
+from clock import system_clock
+
+# Version of the schema created by init_db(), stored in PRAGMA user_version
+SCHEMA_VERSION = 2
+
+# Columns added to the reminders table for syncing between machines
+SYNC_COLUMNS = {
+    "uuid": "TEXT",  # identifies the reminder on every machine
+    "updated_at": "TIMESTAMP",  # when the reminder last changed
+    "version": "INTEGER DEFAULT 1",  # number of changes made to the reminder
+    "origin": "TEXT",  # site id of the machine that made the last change
+    "change_seq": "INTEGER",  # local change sequence number, used as the sync watermark
+    "deleted": "INTEGER DEFAULT 0",  # 1 for a removed reminder kept as a tombstone
+}
+
+# Namespace for the uuids given to reminders created before sync existed
+LEGACY_UUID_NAMESPACE = uuid.UUID("6f1d0c52-5e1a-4c43-9f55-3a0e1b7f2c11")
+
+
+def default_db_path():
+    """Return the path of the default database file in the user's home directory."""
+    return os.path.join(os.path.expanduser("~"), ".reminders.db")
 
 
 class ReminderDatabase:
-    def __init__(self, db_path=None):
-        """Initialize the database connection."""
+    def __init__(self, db_path=None, clock=None):
+        """Initialize the database connection.
+
+        Args:
+            db_path: Path to the SQLite file (defaults to ~/.reminders.db)
+            clock: Source of the current time (defaults to the system clock)
+        """
         if db_path is None:
-            # Use a default database file in the user's home directory
-            db_path = os.path.join(os.path.expanduser("~"), ".reminders.db")
+            db_path = default_db_path()
         self.db_path = db_path
+        self.clock = clock if clock is not None else system_clock
+        self.site_id = None
         self.init_db()
 
+    def _connect(self):
+        """Open a connection to the database file."""
+        return sqlite3.connect(self.db_path)
+
     def init_db(self):
         """Initialize the database with required tables."""
-        with sqlite3.connect(self.db_path) as conn:
-            # Create reminders table
+        with self._connect() as conn:
+            # The daemon opens the database on every poll, so the schema is
+            # only created or migrated when the file is behind SCHEMA_VERSION
+            if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                self._create_schema(conn)
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+            row = conn.execute("SELECT value FROM sync_state WHERE key = 'site_id'").fetchone()
+            if row is None:
+                self.site_id = uuid.uuid4().hex
+                conn.execute("INSERT INTO sync_state (key, value) VALUES ('site_id', ?)", (self.site_id,))
+            else:
+                self.site_id = row[0]
+
+    def _create_schema(self, conn):
+        """Create the tables and indexes, migrating tables created by older versions."""
+        # Let deleted pages be returned to the file system in small steps.
+        # This only takes effect for a new database file; existing files
+        # are converted by the maintenance module.
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+
+        # Create reminders table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS reminders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                message TEXT NOT NULL,
+                scheduled_time TIMESTAMP,
+                last_shown TIMESTAMP,
+                status TEXT DEFAULT 'active',  -- 'active', 'snoozed'
+                snooze_until TIMESTAMP,
+                duration TEXT,  -- stores the original duration format (e.g. '5m', '1h', '10:30')
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self._add_sync_columns(conn)
+
+        # Index the time columns so finding due reminders does not scan the whole table
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_scheduled_time ON reminders (scheduled_time)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_reminders_snooze_until ON reminders (snooze_until)')
+
+        # Create table recording when each maintenance task last ran
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS maintenance_log (
+                task TEXT PRIMARY KEY,
+                last_run TIMESTAMP,
+                duration REAL,  -- seconds the task took
+                result TEXT
+            )
+        ''')
+
+        # Create tables holding this database's site id and what it has received from other sites
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync_peers (
+                site_id TEXT PRIMARY KEY,
+                last_seq INTEGER,  -- highest change_seq received from that site
+                last_sync TIMESTAMP
+            )
+        ''')
+
+        self._backfill_sync_columns(conn)
+
+    def reset_site_id(self):
+        """Give this database a new site id, e.g. after it was created by copying another one."""
+        with self._connect() as conn:
+            self.site_id = uuid.uuid4().hex
+            conn.execute("UPDATE sync_state SET value = ? WHERE key = 'site_id'", (self.site_id,))
+
+    def _add_sync_columns(self, conn):
+        """Add the sync columns and their indexes to a reminders table created before they existed."""
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(reminders)")}
+        for column, definition in SYNC_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE reminders ADD COLUMN {column} {definition}")
+
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_reminders_uuid ON reminders (uuid)')
+
+        # Two rows sharing a change_seq make sync skip one of them, so the
+        # index is unique; earlier versions created it without the constraint
+        self._renumber_duplicate_change_seqs(conn)
+        conn.execute('DROP INDEX IF EXISTS idx_reminders_change_seq')
+        conn.execute('CREATE UNIQUE INDEX idx_reminders_change_seq ON reminders (change_seq)')
+
+    def _renumber_duplicate_change_seqs(self, conn):
+        """Give every row whose change_seq is already used by an older row a new one.
+
+        The renumbered rows are sent again on the next sync, which is harmless
+        because the receiving side keeps whichever version is newer.
+        """
+        rows = conn.execute('''
+            SELECT id FROM reminders AS r
+            WHERE EXISTS (SELECT 1 FROM reminders AS o WHERE o.change_seq = r.change_seq AND o.id < r.id)
+            ORDER BY change_seq, id
+        ''').fetchall()
+        for (rid,) in rows:
             conn.execute('''
-                CREATE TABLE IF NOT EXISTS reminders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    message TEXT NOT NULL,
-                    scheduled_time TIMESTAMP,
-                    last_shown TIMESTAMP,
-                    status TEXT DEFAULT 'active',  -- 'active', 'snoozed'
-                    snooze_until TIMESTAMP,
-                    duration TEXT,  -- stores the original duration format (e.g. '5m', '1h', '10:30')
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+                UPDATE reminders
+                SET change_seq = (SELECT MAX(change_seq) + 1 FROM reminders)
+                WHERE id = ?
+            ''', (rid,))
+
+    def _backfill_sync_columns(self, conn):
+        """Give reminders created before sync existed a uuid and change metadata.
+
+        The uuid is derived from the row's id, creation time and message, so
+        that copies of the same database file agree on it. updated_at is left
+        empty rather than copied from created_at (which SQLite writes in UTC,
+        not in the local time of later changes), so that any real change made
+        on another machine wins over the migrated row.
+        """
+        rows = conn.execute('''
+            SELECT id, created_at, message FROM reminders WHERE uuid IS NULL
+        ''').fetchall()
+        for rid, created_at, message in rows:
+            legacy_uuid = uuid.uuid5(LEGACY_UUID_NAMESPACE, f"{rid}|{created_at}|{message}").hex
+            conn.execute('''
+                UPDATE reminders
+                SET uuid = ?, updated_at = '', version = 1, origin = '', change_seq = id, deleted = 0
+                WHERE id = ?
+            ''', (legacy_uuid, rid))
+
+    def _change_metadata(self):
+        """Return the SQL assignments and values that record a local change to a reminder."""
+        sql = '''updated_at = ?, version = version + 1, origin = ?,
+                change_seq = (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM reminders)'''
+        return sql, [self.clock.now().strftime('%Y-%m-%d %H:%M:%S.%f'), self.site_id]
 
     def add_reminder(self, message, scheduled_time, duration):
         """Add a new reminder to the database."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute('''
-                INSERT INTO reminders (message, scheduled_time, duration)
-                VALUES (?, ?, ?)
-            ''', (message, scheduled_time, duration))
+                INSERT INTO reminders (message, scheduled_time, duration,
+                                       uuid, updated_at, version, origin, change_seq)
+                VALUES (?, ?, ?, ?, ?, 1, ?, (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM reminders))
+            ''', (message, scheduled_time, duration, uuid.uuid4().hex,
+                  self.clock.now().strftime('%Y-%m-%d %H:%M:%S.%f'), self.site_id))
 
             reminder_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
             return reminder_id
@@ -48,8 +200,8 @@ class ReminderDatabase:
     def get_all_reminders(self):
         """Retrieve all reminders from the database.
         Also updates the status of any expired snoozed reminders and paused reminders back to active."""
-        with sqlite3.connect(self.db_path) as conn:
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._connect() as conn:
+            now = self.clock.now().strftime('%Y-%m-%d %H:%M:%S')
             
             # Update any snoozed reminders that have expired to be active again
             conn.execute('''
@@ -70,6 +222,7 @@ class ReminderDatabase:
             result = conn.execute('''
                 SELECT id, message, scheduled_time, last_shown, status, snooze_until, duration
                 FROM reminders
+                WHERE deleted = 0
                 ORDER BY scheduled_time
             ''')
 
@@ -78,8 +231,8 @@ class ReminderDatabase:
     def get_reminder_by_id(self, reminder_id):
         """Get a specific reminder by ID.
         Also updates the status of any expired snoozed reminders and paused reminders back to active."""
-        with sqlite3.connect(self.db_path) as conn:
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._connect() as conn:
+            now = self.clock.now().strftime('%Y-%m-%d %H:%M:%S')
             
             # Update any snoozed reminders that have expired to be active again
             conn.execute('''
@@ -100,33 +253,43 @@ class ReminderDatabase:
             result = conn.execute('''
                 SELECT id, message, scheduled_time, last_shown, status, snooze_until, duration
                 FROM reminders
-                WHERE id = ?
+                WHERE id = ? AND deleted = 0
             ''', (reminder_id,))
 
             return result.fetchone()
 
     def remove_reminder(self, reminder_id):
-        """Remove a reminder by ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            result = conn.execute('DELETE FROM reminders WHERE id = ?', (reminder_id,))
+        """Remove a reminder by ID.
+
+        The row is kept as a tombstone so the removal can be synced to other
+        machines. Its times are cleared so it drops out of the time indexes.
+        """
+        with self._connect() as conn:
+            change_sql, change_values = self._change_metadata()
+            result = conn.execute(f'''
+                UPDATE reminders
+                SET deleted = 1, scheduled_time = NULL, snooze_until = NULL, {change_sql}
+                WHERE id = ? AND deleted = 0
+            ''', change_values + [reminder_id])
             return result.rowcount > 0
 
     
 
     def update_reminder_status(self, reminder_id, status):
         """Update the status of a reminder."""
-        with sqlite3.connect(self.db_path) as conn:
-            result = conn.execute('''
+        with self._connect() as conn:
+            change_sql, change_values = self._change_metadata()
+            result = conn.execute(f'''
                 UPDATE reminders 
-                SET status = ?
-                WHERE id = ?
-            ''', (status, reminder_id))
+                SET status = ?, {change_sql}
+                WHERE id = ? AND deleted = 0
+            ''', [status] + change_values + [reminder_id])
             
             return result.rowcount > 0
 
     def update_reminder_times(self, reminder_id, last_shown=None, scheduled_time=None, snooze_until=None):
         """Update times for a reminder."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             # Build the update query based on provided parameters
             fields = []
             values = []
@@ -144,7 +307,11 @@ class ReminderDatabase:
                 values.append(snooze_until)
 
             if fields:
-                query = f"UPDATE reminders SET {', '.join(fields)} WHERE id = ?"
+                change_sql, change_values = self._change_metadata()
+                fields.append(change_sql)
+                values.extend(change_values)
+
+                query = f"UPDATE reminders SET {', '.join(fields)} WHERE id = ? AND deleted = 0"
                 values.append(reminder_id)
                 
                 result = conn.execute(query, values)
@@ -155,8 +322,8 @@ class ReminderDatabase:
     def get_active_reminders(self):
         """Get all active reminders (snoozed until after now).
         Also updates the status of any expired snoozed reminders back to active."""
-        with sqlite3.connect(self.db_path) as conn:
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._connect() as conn:
+            now = self.clock.now().strftime('%Y-%m-%d %H:%M:%S')
             
             # Update any snoozed reminders that have expired to be active again
             conn.execute('''
@@ -172,6 +339,28 @@ class ReminderDatabase:
                 FROM reminders
                 WHERE (snooze_until IS NULL OR snooze_until <= ?)
                 AND scheduled_time <= ?
+                AND deleted = 0
+            ''', (now, now))
+
+            return result.fetchall()
+
+    def get_next_due_time(self):
+        """Get the earliest time after now at which a reminder may become due.
+
+        This is the nearest future scheduled time or snooze time, so it never
+        lies after the moment the next reminder is returned by
+        get_active_reminders(). Returns the timestamp string, or None if
+        nothing is pending.
+        """
+        with self._connect() as conn:
+            now = self.clock.now().strftime('%Y-%m-%d %H:%M:%S')
+
+            result = conn.execute('''
+                SELECT MIN(next_time) FROM (
+                    SELECT MIN(scheduled_time) AS next_time FROM reminders WHERE scheduled_time > ? AND deleted = 0
+                    UNION ALL
+                    SELECT MIN(snooze_until) AS next_time FROM reminders WHERE snooze_until > ? AND deleted = 0
+                )
             ''', (now, now))
 
-            return result.fetchall()
\ No newline at end of file
+            return result.fetchone()[0]
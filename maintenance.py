@@ -0,0 +1,204 @@
+"""
+Maintenance module for the reminder application.
+Keeps the SQLite database compact and well planned over months of use:
+tombstone purging, incremental vacuuming, planner statistics, integrity
+checks and a size budget.
+The daemon runs the tasks that are due whenever it is idle.
+"""
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+# Pages released to the file system per incremental vacuum step, so a single
+# step never holds the database for long
+VACUUM_STEP_PAGES = 128
+# Database file size above which a full VACUUM is run to get back under it
+SIZE_BUDGET_BYTES = 50 * 1024 * 1024
+# How long removed reminders are kept as tombstones for syncing. A machine
+# that has not synced for longer may bring a purged reminder back.
+TOMBSTONE_RETENTION = timedelta(days=90)
+
+# How often each task runs, in the order they are run
+TASK_INTERVALS = {
+    "purge_tombstones": timedelta(days=7),
+    "incremental_vacuum": timedelta(hours=1),
+    "optimize": timedelta(days=1),
+    "analyze": timedelta(days=7),
+    "integrity_check": timedelta(days=7),
+    "size_budget": timedelta(days=1),
+}
+
+
+def get_storage_stats(db):
+    """Return a dict describing how the database file is laid out."""
+    with db._connect() as conn:
+        stats = {
+            "page_size": conn.execute("PRAGMA page_size").fetchone()[0],
+            "page_count": conn.execute("PRAGMA page_count").fetchone()[0],
+            "freelist_count": conn.execute("PRAGMA freelist_count").fetchone()[0],
+            "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(
+                conn.execute("PRAGMA auto_vacuum").fetchone()[0], "unknown"),
+        }
+    stats["size_bytes"] = stats["page_size"] * stats["page_count"]
+    return stats
+
+
+def get_maintenance_log(db):
+    """Return (task, last_run, duration_seconds, result) rows for every task that has run."""
+    with db._connect() as conn:
+        result = conn.execute('''
+            SELECT task, last_run, duration, result
+            FROM maintenance_log
+            ORDER BY task
+        ''')
+        return result.fetchall()
+
+
+def _purge_tombstones(conn, now, size_budget):
+    """Delete tombstones of reminders removed more than TOMBSTONE_RETENTION ago."""
+    cutoff = (now - TOMBSTONE_RETENTION).strftime('%Y-%m-%d %H:%M:%S')
+    # The newest change is always kept so change sequence numbers are never reused
+    result = conn.execute('''
+        DELETE FROM reminders
+        WHERE deleted = 1 AND updated_at < ?
+        AND change_seq < (SELECT MAX(change_seq) FROM reminders)
+    ''', (cutoff,))
+    return f"purged {result.rowcount} tombstone(s)"
+
+
+def _incremental_vacuum(conn, now, size_budget):
+    """Return up to VACUUM_STEP_PAGES free pages to the file system."""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        # Databases created before auto_vacuum was enabled need one full
+        # VACUUM for the new mode to take effect
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return "converted to incremental auto_vacuum"
+    before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    # execute() only steps the statement once, freeing a single page;
+    # executescript() runs it to completion
+    conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES});")
+    after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return f"freed {before - after} page(s), {after} left"
+
+
+def _optimize(conn, now, size_budget):
+    """Let SQLite refresh whatever planner statistics it considers stale."""
+    conn.execute("PRAGMA optimize").fetchall()
+    return "ok"
+
+
+def _analyze(conn, now, size_budget):
+    """Rebuild the planner statistics for every table and index."""
+    conn.execute("ANALYZE")
+    return "ok"
+
+
+def _integrity_check(conn, now, size_budget):
+    """Check the whole database file for corruption."""
+    problems = [row[0] for row in conn.execute("PRAGMA integrity_check").fetchall()]
+    return "; ".join(problems)
+
+
+def _size_budget(conn, now, size_budget):
+    """Run a full VACUUM if the database file is larger than the budget."""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    size = page_size * conn.execute("PRAGMA page_count").fetchone()[0]
+    if size <= size_budget:
+        return f"{size} bytes, within budget"
+    conn.execute("VACUUM")
+    size = page_size * conn.execute("PRAGMA page_count").fetchone()[0]
+    if size > size_budget:
+        return f"{size} bytes after VACUUM, over budget of {size_budget} bytes"
+    return f"vacuumed to {size} bytes"
+
+
+TASKS = {
+    "purge_tombstones": _purge_tombstones,
+    "incremental_vacuum": _incremental_vacuum,
+    "optimize": _optimize,
+    "analyze": _analyze,
+    "integrity_check": _integrity_check,
+    "size_budget": _size_budget,
+}
+
+
+def run_maintenance(db, force=False, size_budget=SIZE_BUDGET_BYTES):
+    """Run the maintenance tasks that are due (or all of them when forced).
+
+    Each task's run time, duration and result are recorded in the
+    maintenance_log table. A task that cannot run because the database is
+    busy is skipped and retried next time.
+
+    Args:
+        db: The ReminderDatabase to maintain
+        force: Run every task regardless of when it last ran
+        size_budget: Database size in bytes above which a full VACUUM is run
+
+    Returns:
+        List of (task, duration_seconds, result) tuples for the tasks that ran
+
+    Raises:
+        RuntimeError: If the integrity check reports a problem
+    """
+    now = db.clock.now()
+    ran = []
+
+    with db._connect() as conn:
+        last_runs = dict(conn.execute("SELECT task, last_run FROM maintenance_log").fetchall())
+
+    for task, interval in TASK_INTERVALS.items():
+        last_run = last_runs.get(task)
+        if not force and last_run and datetime.fromisoformat(last_run) + interval > now:
+            continue
+
+        try:
+            with db._connect() as conn:
+                # VACUUM cannot run inside a transaction, so run the task in autocommit mode
+                isolation_level = conn.isolation_level
+                conn.isolation_level = None
+                try:
+                    started = time.perf_counter()
+                    result = TASKS[task](conn, now, size_budget)
+                    duration = time.perf_counter() - started
+                finally:
+                    conn.isolation_level = isolation_level
+
+                conn.execute('''
+                    INSERT OR REPLACE INTO maintenance_log (task, last_run, duration, result)
+                    VALUES (?, ?, ?, ?)
+                ''', (task, now.strftime('%Y-%m-%d %H:%M:%S'), duration, result))
+        except sqlite3.OperationalError as e:
+            print(f"Skipping maintenance task {task}: {e}")
+            continue
+
+        ran.append((task, duration, result))
+        if task == "integrity_check" and result != "ok":
+            raise RuntimeError(f"Database integrity check failed: {result}")
+
+    return ran
+
+
+def format_report(db):
+    """Format the storage statistics and the maintenance log as printable lines."""
+    stats = get_storage_stats(db)
+    lines = [
+        f"Database:       {db.db_path}",
+        f"File size:      {os.path.getsize(db.db_path) if os.path.exists(db.db_path) else 0} bytes",
+        f"Page size:      {stats['page_size']} bytes",
+        f"Page count:     {stats['page_count']}",
+        f"Freelist pages: {stats['freelist_count']}",
+        f"Auto vacuum:    {stats['auto_vacuum']}",
+        "",
+        f"{'Task':<20} {'Last Run':<20} {'Duration':<12} Result",
+        "-" * 80,
+    ]
+    log = {task: (last_run, duration, result) for task, last_run, duration, result in get_maintenance_log(db)}
+    for task in TASK_INTERVALS:
+        if task in log:
+            last_run, duration, result = log[task]
+            lines.append(f"{task:<20} {last_run:<20} {f'{duration * 1000:.1f} ms':<12} {result}")
+        else:
+            lines.append(f"{task:<20} Never")
+    return lines
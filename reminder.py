@@ -5,20 +5,22 @@ A lightweight command-line reminder management application.
 """
 
 import argparse
+import sqlite3
 import sys
 from datetime import datetime, timedelta
 import re
 
-from database import ReminderDatabase
+from database import ReminderDatabase, default_db_path
+from clock import system_clock
 
 
-def parse_time_input(time_input):
+def parse_time_input(time_input, clock=system_clock):
     """Parse time input in various formats: hh:mm, Nm, Nh"""
     # Check if it's in hh:mm format
     if re.match(r"^\d{1,2}:\d{2}$", time_input):
         hour, minute = map(int, time_input.split(":"))
         if 0 <= hour <= 23 and 0 <= minute <= 59:
-            now = datetime.now()
+            now = clock.now()
             scheduled_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
             # If the time has already passed today, schedule for tomorrow
             if scheduled_time <= now:
@@ -30,7 +32,7 @@ def parse_time_input(time_input):
     elif re.match(r"^\d{1,3}m$", time_input.lower()):
         minutes = int(time_input[:-1])
         if 1 <= minutes <= 500:
-            scheduled_time = datetime.now() + timedelta(minutes=minutes)
+            scheduled_time = clock.now() + timedelta(minutes=minutes)
             return scheduled_time, time_input
         else:
             raise ValueError("Minutes must be between 1 and 500.")
@@ -38,7 +40,7 @@ def parse_time_input(time_input):
     elif re.match(r"^\d{1,2}h$", time_input.lower()):
         hours = int(time_input[:-1])
         if 1 <= hours <= 24:
-            scheduled_time = datetime.now() + timedelta(hours=hours)
+            scheduled_time = clock.now() + timedelta(hours=hours)
             return scheduled_time, time_input
         else:
             raise ValueError("Hours must be between 1 and 24.")
@@ -46,7 +48,7 @@ def parse_time_input(time_input):
         raise ValueError("Invalid time format. Use hh:mm, Nm, or Nh.")
 
 
-def calculate_remaining_time(scheduled_time_str):
+def calculate_remaining_time(scheduled_time_str, clock=system_clock):
     """Calculate remaining time from scheduled time string and return formatted string (e.g. '1h 14m' or '33m')"""
     if not scheduled_time_str:
         return "N/A"
@@ -58,7 +60,7 @@ def calculate_remaining_time(scheduled_time_str):
             return "N/A"
         
         # Get current time
-        now = datetime.now()
+        now = clock.now()
         
         # Calculate the difference
         time_diff = scheduled_dt - now
@@ -105,11 +107,48 @@ def main():
     # Remove command
     remove_parser = subparsers.add_parser("remove", help="Remove reminder(s) by ID")
     remove_parser.add_argument("ids", help="Comma-separated list of reminder IDs to remove")
+
+    # Simulate command
+    simulate_parser = subparsers.add_parser("simulate", help="Replay the daemon over a time range and print when reminders fire")
+    simulate_parser.add_argument("--from", dest="start", help="Start time as 'YYYY-MM-DD HH:MM' (default: now)")
+    simulate_parser.add_argument("--to", dest="end", required=True, help="End time as 'YYYY-MM-DD HH:MM'")
+    simulate_parser.add_argument("--speed", default="max", help="'max' to run as fast as possible, or a real-time multiplier (e.g. 60)")
+    simulate_parser.add_argument("--action", choices=["stop", "snooze", "repeat"], default="repeat", help="Action the simulated user takes on every reminder (default: repeat)")
+    simulate_parser.add_argument("--db", dest="db_path", help="Database to replay (default: ~/.reminders.db); it is copied, never modified")
+
+    # Maintenance command
+    maintenance_parser = subparsers.add_parser("maintenance", help="Vacuum, analyze and check the database now")
+    maintenance_parser.add_argument("--report", action="store_true", help="Only show page counts, freelist size and the last run of each step")
+    maintenance_parser.add_argument("--budget-mb", type=float, help="Size budget in MB above which a full VACUUM is run (default: 50)")
+
+    # Sync command
+    sync_parser = subparsers.add_parser("sync", help="Exchange changed reminders with another reminder database")
+    sync_parser.add_argument("target", help="Other database file, or a directory holding a .reminders.db")
+    sync_parser.add_argument("--create", action="store_true", help="Create the target database file if it does not exist")
+
+    # Soak command
+    soak_parser = subparsers.add_parser("soak", help="Run the daemon loop headless under a virtual clock and check for resource leaks")
+    soak_parser.add_argument("--ticks", type=int, default=1000000, help="Number of daemon polls to run (default: 1000000)")
+    soak_parser.add_argument("--reminders", type=int, default=100, help="Number of reminders in the synthetic store (default: 100)")
+    soak_parser.add_argument("--report", default="soak_report.json", help="File the JSON report is written to (default: soak_report.json)")
+    soak_parser.add_argument("--budget-rss-mb", type=float, help="Allowed RSS growth in MB (default: 20)")
+    soak_parser.add_argument("--budget-handles", type=int, help="Allowed growth in open file descriptors/handles (default: 5)")
+    soak_parser.add_argument("--budget-traced-mb", type=float, help="Allowed growth of tracemalloc-traced memory in MB (default: 10)")
     
     
     
     args = parser.parse_args()
 
+    # These commands work on a copy or a synthetic store and must not create
+    # or migrate the user's database
+    if args.command == "simulate":
+        simulate_reminders(args.db_path or default_db_path(), args.start, args.end, args.speed, args.action)
+        return
+    if args.command == "soak":
+        budget = {"rss_mb": args.budget_rss_mb, "open_handles": args.budget_handles, "traced_mb": args.budget_traced_mb}
+        soak_test(args.ticks, args.reminders, args.report, budget)
+        return
+
     # Initialize database
     db = ReminderDatabase()
 
@@ -126,6 +165,10 @@ def main():
         add_reminder(db, message, args.time)
     elif args.command == "remove":
         remove_reminders(db, args.ids)
+    elif args.command == "maintenance":
+        maintain_database(db, args.report, args.budget_mb)
+    elif args.command == "sync":
+        sync_reminders(db, args.target, args.create)
     
     else:
         print(f"Unknown command: {args.command}")
@@ -162,10 +205,101 @@ def remove_reminders(db, ids_str):
         sys.exit(1)
 
 
+def parse_datetime_input(value):
+    """Parse a date and time given as 'YYYY-MM-DD HH:MM' (or 'YYYY-MM-DD', meaning midnight)."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        parsed = None
+    # Times are local and compared in whole seconds, so time zones and
+    # fractions of a second are not accepted
+    if parsed is None or parsed.tzinfo is not None or parsed.microsecond:
+        raise ValueError(f"Invalid date/time '{value}'. Use 'YYYY-MM-DD HH:MM'.")
+    return parsed
+
+
+def simulate_reminders(db_path, start_str, end_str, speed_str, action):
+    """Replay the daemon against a copy of the database and print the firing timeline."""
+    from simulator import simulate, ScriptedNotifier, format_timeline
+
+    try:
+        start = parse_datetime_input(start_str) if start_str else system_clock.now().replace(microsecond=0)
+        end = parse_datetime_input(end_str)
+        if end < start:
+            raise ValueError("--to must not be before --from.")
+        if speed_str == "max":
+            speed = None
+        else:
+            try:
+                speed = float(speed_str)
+            except ValueError:
+                speed = 0
+            if speed <= 0:
+                raise ValueError("Speed must be 'max' or a positive number.")
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    timeline = simulate(db_path, start, end, ScriptedNotifier(action), speed)
+    for line in format_timeline(timeline):
+        print(line)
+
+
+def maintain_database(db, report_only, budget_mb):
+    """Run every database maintenance step now (unless only a report is wanted) and print the report."""
+    from maintenance import run_maintenance, format_report, SIZE_BUDGET_BYTES
+
+    if not report_only:
+        size_budget = int(budget_mb * 1024 * 1024) if budget_mb else SIZE_BUDGET_BYTES
+        try:
+            run_maintenance(db, force=True, size_budget=size_budget)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+
+    for line in format_report(db):
+        print(line)
+
+
+def sync_reminders(db, target, create=False):
+    """Sync the reminders with another reminder database."""
+    from sync import sync_databases, resolve_sync_path
+
+    try:
+        other = ReminderDatabase(resolve_sync_path(target, create), clock=db.clock)
+        pulled, pushed = sync_databases(db, other)
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Synced with {other.db_path}")
+    print(f"Received {pulled} change(s), sent {pushed} change(s)")
+
+
+def soak_test(ticks, reminders, report_path, budget):
+    """Run the soak test, print its summary and write the full report."""
+    from soak import run_soak, write_report, format_report
+
+    if ticks < 1 or reminders < 1:
+        print("Error: --ticks and --reminders must be positive.")
+        sys.exit(1)
+
+    print(f"Running {ticks} daemon polls against {reminders} synthetic reminders...")
+    report = run_soak(ticks=ticks, reminders=reminders,
+                      budget={key: value for key, value in budget.items() if value is not None})
+    write_report(report, report_path)
+
+    for line in format_report(report):
+        print(line)
+    print(f"Report written to {report_path}")
+
+    if not report["passed"]:
+        sys.exit(1)
+
+
 def add_reminder(db, message, time_input):
     """Add a new reminder."""
     try:
-        scheduled_time, duration = parse_time_input(time_input)
+        scheduled_time, duration = parse_time_input(time_input, db.clock)
         reminder_id = db.add_reminder(message, scheduled_time.strftime("%Y-%m-%d %H:%M:%S"), duration)
         print(f"Reminder added with ID: {reminder_id}")
         print(f"Message: {message}")
@@ -191,7 +325,7 @@ def list_reminders(db):
             
             # Format timestamps to show only date and time (yyyy-mm-dd hh:mm), or just time if today
             from datetime import datetime
-            today = datetime.now().date()
+            today = db.clock.now().date()
             try:
                 scheduled_dt = datetime.fromisoformat(scheduled_time.replace('Z', '+00:00')) if scheduled_time else None
                 if scheduled_dt:
@@ -214,7 +348,7 @@ def list_reminders(db):
                         pass  # Keep original if parsing fails
             
             # Calculate remaining time
-            remaining_time_str = calculate_remaining_time(scheduled_time)
+            remaining_time_str = calculate_remaining_time(scheduled_time, db.clock)
             
             if last_shown:
                 try:
@@ -244,7 +378,7 @@ def list_reminders(db):
             if snooze_until:
                 # Check if snooze is still in effect or has expired
                 from datetime import datetime
-                now = datetime.now()
+                now = db.clock.now()
                 try:
                     snooze_dt = datetime.fromisoformat(snooze_until.replace('Z', '+00:00')) if snooze_until else None
                     if snooze_dt and now <= snooze_dt:
@@ -3,102 +3,154 @@
 Reminder Daemon
 This script runs in the background to check and display reminders.
 """
-import time
-import sqlite3
-from datetime import datetime
-from reminder_dialog import show_reminder_dialog
+from datetime import timedelta
 from database import ReminderDatabase
+from clock import system_clock
+from maintenance import run_maintenance
+
+# How often the daemon checks for due reminders, in seconds
+POLL_INTERVAL = 30
+# How long the daemon waits after an error before trying again, in seconds
+ERROR_RETRY_INTERVAL = 10
+# How long the "Snooze" action postpones a reminder
+SNOOZE_DURATION = timedelta(minutes=5)
+
+
+def next_occurrence(duration, now):
+    """Calculate the next occurrence of a repeated reminder from its original duration."""
+    if ":" in duration:  # Time format (hh:mm)
+        hour, minute = map(int, duration.split(":"))
+        next_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if next_time <= now:
+            next_time += timedelta(days=1)
+        return next_time
+    elif duration.lower().endswith("m"):  # Minutes format (Nm)
+        return now + timedelta(minutes=int(duration[:-1]))
+    elif duration.lower().endswith("h"):  # Hours format (Nh)
+        return now + timedelta(hours=int(duration[:-1]))
+    return None
+
+
+def process_due_reminders(db, notifier, clock=system_clock, on_error=None):
+    """Show every reminder that is due now and apply the user's action.
+
+    Args:
+        db: The ReminderDatabase to read and update
+        notifier: Callable with the signature of show_reminder_dialog returning
+                  "stop", "snooze" or "repeat"
+        clock: Source of the current time
+        on_error: Optional callable (reminder, exception) invoked when a single
+                  reminder fails; the remaining reminders are still processed
+
+    Returns:
+        List of (id, message, action) tuples for the reminders that were shown
+    """
+    fired = []
+
+    # Check for active reminders that should be shown now
+    active_reminders = db.get_active_reminders()
+
+    for reminder in active_reminders:
+        try:
+            rid, message, scheduled_time, last_shown, status, snooze_until, duration = reminder
+
+            # Show the reminder dialog
+            result = notifier(message, duration, last_shown, scheduled_time)
+            fired.append((rid, message, result))
+
+            # Handle the user action
+            now = clock.now()
+            if result == "stop":
+                # Remove the reminder
+                db.remove_reminder(rid)
+            elif result == "snooze":
+                # Snooze for 5 minutes
+                db.update_reminder_times(rid, last_shown=now, snooze_until=now + SNOOZE_DURATION)
+                db.update_reminder_status(rid, "snoozed")
+            elif result == "repeat":
+                # Calculate next occurrence based on original duration
+                next_time = next_occurrence(duration, now)
+                if next_time is not None:
+                    db.update_reminder_times(rid, last_shown=now, scheduled_time=next_time)
+        except Exception as e:
+            print(f"Error processing reminder: {e}")
+            if on_error is not None:
+                on_error(reminder, e)
+            # Continue with next reminder instead of stopping the entire daemon
+            continue
+
+    return fired
+
+
+def show_error_popup(title, message):
+    """Show an error message box, or print the message if tkinter is unavailable."""
+    try:
+        import tkinter as tk
+        from tkinter import messagebox
+        root = tk.Tk()
+        root.withdraw()  # Hide the main window
+        messagebox.showerror(title, message)
+        root.destroy()
+    except:
+        print(message)
+
+
+def run_daemon(clock=system_clock, notifier=None, db_path=None, on_error=show_error_popup,
+               max_ticks=None, on_tick=None, on_reminder_error=None):
+    """Run the daemon loop: show due reminders, maintain the database when idle, then sleep.
+
+    Args:
+        clock: Source of the current time and of the sleep between polls
+        notifier: Callable showing a reminder (defaults to show_reminder_dialog)
+        db_path: Database to use (defaults to ~/.reminders.db)
+        on_error: Callable (title, message) used to report an error in a poll
+        max_ticks: Stop after this many polls (runs forever if None)
+        on_tick: Optional callable invoked with the poll number after each poll
+        on_reminder_error: Optional callable (reminder, exception) invoked when
+                           a single reminder fails to be processed
+    """
+    if notifier is None:
+        from reminder_dialog import show_reminder_dialog
+        notifier = show_reminder_dialog
+
+    tick = 0
+    while max_ticks is None or tick < max_ticks:
+        tick += 1
+        try:
+            # Reinitialize database connection in each loop to handle potential connection issues
+            db = ReminderDatabase(db_path, clock=clock)
+            fired = process_due_reminders(db, notifier, clock, on_reminder_error)
+
+            # Use idle polls to keep the database file in shape
+            if not fired:
+                run_maintenance(db)
+
+        except Exception as e:
+            print(f"Error in daemon loop: {e}")
+            # Show error popup
+            on_error("Reminder Daemon Error", f"The reminder daemon encountered an error:\n{str(e)}\n\nThe daemon will attempt to continue running.")
+            # Wait a bit before trying again to avoid rapid error loops
+            clock.sleep(ERROR_RETRY_INTERVAL)
+        else:
+            # Sleep for a short period before checking again
+            clock.sleep(POLL_INTERVAL)  # Check every 30 seconds
+
+        if on_tick is not None:
+            on_tick(tick)
 
 
 def main():
     """Main daemon loop."""
     print("Reminder daemon started. Press Ctrl+C to stop.")
-    
-    try:
-        while True:
-            try:
-                # Reinitialize database connection in each loop to handle potential connection issues
-                db = ReminderDatabase()
-                
-                # Check for active reminders that should be shown now
-                active_reminders = db.get_active_reminders()
-                
-                for reminder in active_reminders:
-                    try:
-                        rid, message, scheduled_time, last_shown, status, snooze_until, duration = reminder
-                        
-                        # Show the reminder dialog
-                        result = show_reminder_dialog(message, duration, last_shown, scheduled_time)
-                        
-                        # Handle the user action
-                        if result == "stop":
-                            # Remove the reminder
-                            db.remove_reminder(rid)
-                        elif result == "snooze":
-                            # Snooze for 5 minutes
-                            from datetime import datetime, timedelta
-                            snooze_until = datetime.now() + timedelta(minutes=5)
-                            db.update_reminder_times(rid, last_shown=datetime.now(), snooze_until=snooze_until)
-                            db.update_reminder_status(rid, "snoozed")
-                        elif result == "repeat":
-                            # Calculate next occurrence based on original duration
-                            from datetime import datetime, timedelta
-                            import re
-                            
-                            if ":" in duration:  # Time format (hh:mm)
-                                hour, minute = map(int, duration.split(":"))
-                                now = datetime.now()
-                                next_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                                if next_time <= now:
-                                    next_time += timedelta(days=1)
-                                db.update_reminder_times(rid, last_shown=datetime.now(), scheduled_time=next_time)
-                            elif duration.lower().endswith("m"):  # Minutes format (Nm)
-                                minutes = int(duration[:-1])
-                                next_time = datetime.now() + timedelta(minutes=minutes)
-                                db.update_reminder_times(rid, last_shown=datetime.now(), scheduled_time=next_time)
-                            elif duration.lower().endswith("h"):  # Hours format (Nh)
-                                hours = int(duration[:-1])
-                                next_time = datetime.now() + timedelta(hours=hours)
-                                db.update_reminder_times(rid, last_shown=datetime.now(), scheduled_time=next_time)
-                    except Exception as e:
-                        print(f"Error processing reminder: {e}")
-                        # Continue with next reminder instead of stopping the entire daemon
-                        continue
-            
-            except Exception as e:
-                print(f"Error in daemon loop: {e}")
-                # Show error popup
-                try:
-                    import tkinter as tk
-                    from tkinter import messagebox
-                    root = tk.Tk()
-                    root.withdraw()  # Hide the main window
-                    messagebox.showerror("Reminder Daemon Error", f"The reminder daemon encountered an error:\n{str(e)}\n\nThe daemon will attempt to continue running.")
-                    root.destroy()
-                except:
-                    # If tkinter fails, just continue
-                    pass
-                # Wait a bit before trying again to avoid rapid error loops
-                time.sleep(10)
-                continue
-            
-            # Sleep for a short period before checking again
-            time.sleep(30)  # Check every 30 seconds
 
+    try:
+        run_daemon()
     except KeyboardInterrupt:
         print("\nReminder daemon stopped by user.")
         return
     except Exception as e:
         # Show error popup for unexpected errors
-        try:
-            import tkinter as tk
-            from tkinter import messagebox
-            root = tk.Tk()
-            root.withdraw()  # Hide the main window
-            messagebox.showerror("Reminder Daemon Fatal Error", f"The reminder daemon encountered a fatal error:\n{str(e)}\n\nDaemon will now exit.")
-            root.destroy()
-        except:
-            print(f"Reminder daemon encountered a fatal error: {e}")
+        show_error_popup("Reminder Daemon Fatal Error", f"The reminder daemon encountered a fatal error:\n{str(e)}\n\nDaemon will now exit.")
         return
 
 
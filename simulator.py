@@ -0,0 +1,172 @@
+"""
+Simulation module for the reminder application.
+Replays the daemon's scheduler against a copy of a reminder database under a
+virtual clock, so that days or weeks of schedules can be checked in seconds.
+"""
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from clock import VirtualClock
+from database import ReminderDatabase
+from reminder_daemon import POLL_INTERVAL, process_due_reminders
+
+
+class ScriptedNotifier:
+    """Stand-in for the reminder dialog that answers from a script.
+
+    Each firing of a reminder consumes the next action scripted for its
+    message; once a message's script is exhausted (or it has none), the
+    default action is returned.
+    """
+
+    def __init__(self, default_action="repeat", script=None):
+        """Initialize the notifier.
+
+        Args:
+            default_action: Action returned when nothing is scripted ("stop", "snooze" or "repeat")
+            script: Optional dict mapping a reminder message to a list of actions
+        """
+        self.default_action = default_action
+        self.script = {message: list(actions) for message, actions in (script or {}).items()}
+
+    def __call__(self, message, duration, last_shown, scheduled_time):
+        """Return the scripted action for this firing of the reminder."""
+        actions = self.script.get(message)
+        if actions:
+            return actions.pop(0)
+        return self.default_action
+
+
+class _TickConnection:
+    """Context manager handing out the shared connection without committing on exit."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class _SimulationDatabase(ReminderDatabase):
+    """ReminderDatabase over a throwaway copy, kept on a single fast connection.
+
+    The copy is discarded after the run, so commits do not need to be synced
+    to disk. Using one connection also avoids reopening the file on every call,
+    and the caller commits once per poll instead of once per statement.
+    """
+
+    def __init__(self, db_path, clock):
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.execute("PRAGMA journal_mode = MEMORY")
+        self._tick_connection = _TickConnection(self._conn)
+        super().__init__(db_path, clock=clock)
+        self.commit()
+
+    def _connect(self):
+        """Return the shared connection; changes are kept until commit() is called."""
+        return self._tick_connection
+
+    def commit(self):
+        """Commit everything changed since the last commit."""
+        self._conn.commit()
+
+    def close(self):
+        """Commit and close the shared connection."""
+        self._conn.commit()
+        self._conn.close()
+
+
+def _parse_timestamp(value):
+    """Parse a timestamp string as stored in the database."""
+    return datetime.fromisoformat(value)
+
+
+def _next_tick(start, moment):
+    """Return the first poll tick (start + k * POLL_INTERVAL) at or after the given moment."""
+    ticks, remainder = divmod((moment - start).total_seconds(), POLL_INTERVAL)
+    if remainder:
+        ticks += 1
+    return start + timedelta(seconds=ticks * POLL_INTERVAL)
+
+
+def simulate(db_path, start, end, notifier=None, speed=None):
+    """Run the scheduler from start to end against a copy of the given database.
+
+    The daemon polls every POLL_INTERVAL seconds. When running at maximum
+    speed (speed is None), ticks where no reminder can be due are skipped by
+    jumping straight to the tick at which the next reminder becomes due, so
+    the cost grows with the number of firings rather than the time span.
+    With a numeric speed every tick is replayed and the clock runs that many
+    times faster than real time.
+
+    Args:
+        db_path: Path of the database to replay (it is never modified)
+        start: Datetime at which the simulation begins
+        end: Datetime at which the simulation stops
+        notifier: Callable answering each reminder (defaults to ScriptedNotifier())
+        speed: Real-time multiplier, or None to run as fast as possible
+
+    Returns:
+        List of (time, id, message, action) tuples in firing order
+    """
+    if notifier is None:
+        notifier = ScriptedNotifier()
+    # The database compares times in whole seconds; a sub-second start would
+    # put every poll tick just before the times reminders are scheduled for
+    start = start.replace(microsecond=0)
+    end = end.replace(microsecond=0)
+
+    timeline = []
+    clock = VirtualClock(start, speed=speed)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sim_path = os.path.join(tmp_dir, "simulation.db")
+        if os.path.exists(db_path):
+            # The daemon may be writing the file; the backup API takes a
+            # transactionally consistent snapshot where a file copy could not
+            source = sqlite3.connect(db_path)
+            copy = sqlite3.connect(sim_path)
+            try:
+                source.backup(copy)
+            finally:
+                copy.close()
+                source.close()
+        db = _SimulationDatabase(sim_path, clock)
+
+        try:
+            while clock.now() <= end:
+                fired = process_due_reminders(db, notifier, clock)
+                db.commit()
+                for rid, message, action in fired:
+                    timeline.append((clock.now(), rid, message, action))
+
+                if speed is None:
+                    next_due = db.get_next_due_time()
+                    if next_due is None:
+                        break
+                    next_tick = _next_tick(start, _parse_timestamp(next_due))
+                    if next_tick <= clock.now():
+                        # Due now but not picked up by this poll; always move on
+                        next_tick = clock.now() + timedelta(seconds=POLL_INTERVAL)
+                    clock.advance_to(next_tick)
+                else:
+                    clock.sleep(POLL_INTERVAL)
+        finally:
+            db.close()
+
+    return timeline
+
+
+def format_timeline(timeline):
+    """Format a simulation timeline as printable lines."""
+    lines = [f"{'Time':<20} {'ID':<6} {'Action':<8} Message", "-" * 70]
+    for moment, rid, message, action in timeline:
+        lines.append(f"{moment.strftime('%Y-%m-%d %H:%M:%S'):<20} {rid:<6} {str(action):<8} {message}")
+    lines.append(f"\n{len(timeline)} reminder(s) fired")
+    return lines
@@ -0,0 +1,225 @@
+"""
+Soak test module for the reminder application.
+Runs the daemon loop for a very large number of polls against a synthetic
+reminder store, with a headless notifier and a virtual clock, and checks that
+memory and open file handles do not grow beyond a budget. The notifier never
+creates a Tk dialog, so leaks in the dialog code are not covered.
+"""
+import gc
+import json
+import os
+import platform
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+import psutil
+
+from clock import VirtualClock
+from database import ReminderDatabase
+from reminder_daemon import run_daemon
+
+# Allowed growth between the first sample after warm-up and the last sample
+DEFAULT_BUDGET = {
+    "rss_mb": 20.0,
+    "open_handles": 5,
+    "traced_mb": 10.0,
+    "errors": 0,
+}
+
+# Answers given by the headless notifier, in turn; "stop" removes a reminder,
+# which the harness replaces after the same poll so the store keeps its size
+NOTIFIER_ACTIONS = ("repeat", "repeat", "snooze", "repeat", "stop")
+DURATIONS = ("5m", "15m", "45m", "2h", "8h", "09:00", "13:30")
+
+
+class HeadlessNotifier:
+    """Stand-in for the reminder dialog that cycles through fixed answers."""
+
+    def __init__(self, actions=NOTIFIER_ACTIONS):
+        """Initialize the notifier with the actions to return in turn."""
+        self.actions = actions
+        self.shown = 0
+        self.stopped = 0
+
+    def __call__(self, message, duration, last_shown, scheduled_time):
+        """Return the next action."""
+        action = self.actions[self.shown % len(self.actions)]
+        self.shown += 1
+        if action == "stop":
+            self.stopped += 1
+        return action
+
+
+def create_synthetic_store(db_path, reminders, clock):
+    """Fill a new database with reminders spread over the next day."""
+    db = ReminderDatabase(db_path, clock=clock)
+    start = clock.now()
+    updated_at = start.strftime('%Y-%m-%d %H:%M:%S.%f')
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany('''
+            INSERT INTO reminders (message, scheduled_time, duration, uuid, updated_at, version, origin, change_seq)
+            VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+        ''', (
+            (f"Soak reminder {i}",
+             (start + timedelta(seconds=(i * 86400) // reminders)).strftime('%Y-%m-%d %H:%M:%S'),
+             DURATIONS[i % len(DURATIONS)], uuid.uuid4().hex, updated_at, db.site_id, i + 1)
+            for i in range(reminders)
+        ))
+    return db
+
+
+def _open_handles(process):
+    """Return the number of open file descriptors (handles on Windows)."""
+    if os.name == 'nt':
+        return process.num_handles()
+    return process.num_fds()
+
+
+def take_sample(process, tick, clock, store):
+    """Measure the current resource usage of this process."""
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    return {
+        "tick": tick,
+        "virtual_time": clock.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "reminders": len(store.get_all_reminders()),
+        "rss_mb": process.memory_info().rss / (1024 * 1024),
+        "open_handles": _open_handles(process),
+        "traced_mb": traced / (1024 * 1024),
+    }
+
+
+def _top_allocators(baseline, snapshot, limit):
+    """Return the source lines whose allocations grew the most since baseline."""
+    stats = snapshot.compare_to(baseline, "lineno")
+    return [
+        {"location": str(stat.traceback), "size_diff_kb": stat.size_diff / 1024, "count_diff": stat.count_diff}
+        for stat in stats[:limit]
+    ]
+
+
+def run_soak(ticks=1000000, reminders=1000, samples=20, warmup_ticks=None, budget=None, db_path=None, top=10):
+    """Run the daemon loop for the given number of polls and measure resource growth.
+
+    Args:
+        ticks: Number of daemon polls to run (each advances the virtual clock by one poll interval)
+        reminders: Number of reminders in the synthetic store
+        samples: Number of resource samples taken after warm-up
+        warmup_ticks: Polls run before the baseline sample (default: 1% of ticks, at least 100)
+        budget: Dict overriding entries of DEFAULT_BUDGET
+        db_path: Where to create the synthetic store (default: a temporary file)
+        top: Number of top growing allocation sites to report
+
+    Returns:
+        The report dict; its "passed" entry is False if any growth is over budget
+    """
+    budget = dict(DEFAULT_BUDGET, **(budget or {}))
+    if warmup_ticks is None:
+        warmup_ticks = min(max(ticks // 100, 100), ticks)
+    sample_every = max((ticks - warmup_ticks) // max(samples, 1), 1)
+
+    start = datetime(2026, 1, 5, 8, 0, 0)
+    clock = VirtualClock(start)
+    notifier = HeadlessNotifier()
+    process = psutil.Process()
+    errors = []
+    sample_list = []
+    state = {"baseline": None, "replaced": 0}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if db_path is None:
+            db_path = os.path.join(tmp_dir, "soak.db")
+        store = create_synthetic_store(db_path, reminders, clock)
+
+        def on_error(title, message):
+            errors.append({"virtual_time": clock.now().strftime('%Y-%m-%d %H:%M:%S'), "message": message})
+
+        def on_reminder_error(reminder, error):
+            on_error("Reminder Error", f"Error processing reminder {reminder[0]}: {error}")
+
+        def on_tick(tick):
+            # Replace the reminders removed in this poll, so every poll runs
+            # against a store of the same size
+            for i in range(state["replaced"], notifier.stopped):
+                store.add_reminder(f"Soak replacement {i}",
+                                   (clock.now() + timedelta(minutes=i % 60 + 1)).strftime('%Y-%m-%d %H:%M:%S'),
+                                   DURATIONS[i % len(DURATIONS)])
+            state["replaced"] = notifier.stopped
+
+            if tick == warmup_ticks or (tick > warmup_ticks and (tick - warmup_ticks) % sample_every == 0) or tick == ticks:
+                sample_list.append(take_sample(process, tick, clock, store))
+                if tick == warmup_ticks:
+                    state["baseline"] = tracemalloc.take_snapshot()
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            run_daemon(clock=clock, notifier=notifier, db_path=db_path, on_error=on_error,
+                       max_ticks=ticks, on_tick=on_tick, on_reminder_error=on_reminder_error)
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        first, last = sample_list[0], sample_list[-1]
+        growth = {key: last[key] - first[key] for key in ("rss_mb", "open_handles", "traced_mb")}
+        growth["errors"] = len(errors)
+        over_budget = [key for key, limit in budget.items() if growth[key] > limit]
+
+        return {
+            "created": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "config": {"ticks": ticks, "reminders": reminders, "warmup_ticks": warmup_ticks,
+                       "sample_every": sample_every},
+            "elapsed_seconds": elapsed,
+            "ticks_per_second": ticks / elapsed if elapsed else None,
+            "virtual_span": str(clock.now() - start),
+            "reminders_shown": notifier.shown,
+            "budget": budget,
+            "growth": growth,
+            "over_budget": over_budget,
+            "passed": not over_budget,
+            "samples": sample_list,
+            "errors": errors[:top],
+            "top_allocators": _top_allocators(state["baseline"], snapshot, top),
+        }
+
+
+def write_report(report, path):
+    """Write a soak report as JSON, so runs can be compared between releases."""
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def format_report(report):
+    """Format the summary of a soak report as printable lines."""
+    lines = [
+        f"Ticks:           {report['config']['ticks']} ({report['virtual_span']} of virtual time)",
+        f"Reminders:       {report['config']['reminders']} in store, {report['reminders_shown']} shown",
+        f"Elapsed:         {report['elapsed_seconds']:.1f} s ({report['ticks_per_second']:.0f} ticks/s)",
+        "",
+        f"{'Measure':<15} {'First':>10} {'Last':>10} {'Growth':>10} {'Budget':>10}",
+        "-" * 59,
+    ]
+    first, last = report["samples"][0], report["samples"][-1]
+    for key in ("rss_mb", "open_handles", "traced_mb"):
+        lines.append(f"{key:<15} {first[key]:>10.2f} {last[key]:>10.2f} {report['growth'][key]:>10.2f} {report['budget'][key]:>10.2f}")
+    lines.append(f"{'errors':<15} {'':>10} {'':>10} {report['growth']['errors']:>10} {report['budget']['errors']:>10}")
+
+    if report["top_allocators"]:
+        lines += ["", "Top growing allocation sites:"]
+        for allocator in report["top_allocators"]:
+            lines.append(f"  {allocator['size_diff_kb']:>+10.1f} KiB {allocator['count_diff']:>+8} blocks  {allocator['location']}")
+
+    lines.append("")
+    if report["passed"]:
+        lines.append("PASSED: all growth within budget")
+    else:
+        lines.append(f"FAILED: over budget: {', '.join(report['over_budget'])}")
+    return lines
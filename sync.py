@@ -0,0 +1,142 @@
+"""
+Sync module for the reminder application.
+Exchanges changed reminders between two reminder databases, e.g. the ones on
+a laptop and a workstation, so that both end up with the same reminders.
+
+Every local change gives the row the next change sequence number of its
+database. Each database remembers, per other site, the highest sequence
+number it has received from it, so a sync only reads the rows changed since
+then. Conflicting versions of a reminder are resolved by keeping the one
+with the latest (updated_at, version, origin), which both sides agree on.
+"""
+import os
+
+# Columns copied between databases; id is local to each database and never sent
+SYNCED_COLUMNS = (
+    "uuid", "message", "scheduled_time", "last_shown", "status", "snooze_until",
+    "duration", "created_at", "updated_at", "version", "origin", "deleted",
+)
+
+
+def resolve_sync_path(target, create=False):
+    """Return the database file for a sync target given as a file or a directory.
+
+    A directory's .reminders.db is created by the first sync. A file path
+    must already exist unless create is True, so that a mistyped path does
+    not silently receive a full copy of the reminders.
+
+    Raises:
+        ValueError: If the target file does not exist and create is False
+    """
+    if os.path.isdir(target):
+        return os.path.join(target, ".reminders.db")
+    if not create and not os.path.exists(target):
+        raise ValueError(f"Database file '{target}' does not exist. Use --create to create it.")
+    return target
+
+
+def _conflict_key(updated_at, version, origin):
+    """Return the value deciding which of two versions of a reminder wins."""
+    return (updated_at or "", version or 0, origin or "")
+
+
+def _transfer(source, destination):
+    """Apply the rows source changed since destination last received from it.
+
+    Returns:
+        Number of rows that were inserted or updated in destination
+    """
+    with destination._connect() as conn:
+        row = conn.execute("SELECT last_seq FROM sync_peers WHERE site_id = ?", (source.site_id,)).fetchone()
+        watermark = row[0] if row else 0
+
+    with source._connect() as conn:
+        row = conn.execute("SELECT last_seq FROM sync_peers WHERE site_id = ?", (destination.site_id,)).fetchone()
+        seen_by_source = row[0] if row else 0
+        high_seq = conn.execute("SELECT COALESCE(MAX(change_seq), 0) FROM reminders").fetchone()[0]
+        changes = conn.execute(f'''
+            SELECT {", ".join(SYNCED_COLUMNS)}
+            FROM reminders
+            WHERE change_seq > ? AND change_seq <= ?
+            ORDER BY change_seq
+        ''', (watermark, high_seq)).fetchall()
+
+    if high_seq <= watermark:
+        return 0
+
+    applied = 0
+    with destination._connect() as conn:
+        # Take the write lock before reading the highest change_seq, so a
+        # local change made meanwhile (e.g. by the daemon) cannot get one of
+        # the sequence numbers given to the rows received here
+        conn.execute("BEGIN IMMEDIATE")
+        first_seq = conn.execute("SELECT COALESCE(MAX(change_seq), 0) FROM reminders").fetchone()[0] + 1
+        next_seq = first_seq
+
+        for change in changes:
+            values = dict(zip(SYNCED_COLUMNS, change))
+            local = conn.execute('''
+                SELECT updated_at, version, origin FROM reminders WHERE uuid = ?
+            ''', (values["uuid"],)).fetchone()
+
+            if local is None:
+                conn.execute(f'''
+                    INSERT INTO reminders ({", ".join(SYNCED_COLUMNS)}, change_seq)
+                    VALUES ({", ".join("?" * len(SYNCED_COLUMNS))}, ?)
+                ''', list(values.values()) + [next_seq])
+            elif _conflict_key(values["updated_at"], values["version"], values["origin"]) > _conflict_key(*local):
+                conn.execute(f'''
+                    UPDATE reminders
+                    SET {", ".join(f"{column} = ?" for column in SYNCED_COLUMNS)}, change_seq = ?
+                    WHERE uuid = ?
+                ''', list(values.values()) + [next_seq, values["uuid"]])
+            else:
+                # Destination already has this version or a newer one
+                continue
+
+            # Give the row a new local sequence number so it is passed on to further sites
+            next_seq += 1
+            applied += 1
+
+        now = destination.clock.now().strftime('%Y-%m-%d %H:%M:%S')
+        conn.execute('''
+            INSERT OR REPLACE INTO sync_peers (site_id, last_seq, last_sync)
+            VALUES (?, ?, ?)
+        ''', (source.site_id, high_seq, now))
+
+    if applied and seen_by_source == first_seq - 1:
+        # Source had already received every earlier change of destination, and
+        # the rows just applied all came from source, so it can skip past them
+        # instead of having them sent back on the next transfer
+        with source._connect() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO sync_peers (site_id, last_seq, last_sync)
+                VALUES (?, ?, ?)
+            ''', (destination.site_id, next_seq - 1, now))
+
+    return applied
+
+
+def sync_databases(local, other):
+    """Bring two reminder databases in step with each other.
+
+    Args:
+        local: The ReminderDatabase of this machine
+        other: The ReminderDatabase to sync with
+
+    Returns:
+        Tuple (pulled, pushed) with the number of reminders changed in the
+        local and in the other database
+
+    Raises:
+        ValueError: If both refer to the same database file
+    """
+    if os.path.exists(other.db_path) and os.path.samefile(local.db_path, other.db_path):
+        raise ValueError("Cannot sync a reminder database with itself.")
+    if local.site_id == other.site_id:
+        # The other file was copied from this one; it needs an identity of its own
+        other.reset_site_id()
+
+    pulled = _transfer(other, local)
+    pushed = _transfer(local, other)
+    return pulled, pushed
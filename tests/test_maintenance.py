@@ -0,0 +1,116 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from clock import VirtualClock
+from database import ReminderDatabase
+from maintenance import (
+    run_maintenance, get_storage_stats, get_maintenance_log, format_report, VACUUM_STEP_PAGES,
+)
+
+START = datetime(2026, 10, 19, 9, 0, 0)
+
+
+def make_churned_db(path, clock, rows=20000):
+    """Create a database and delete most of its rows, leaving a large freelist."""
+    db = ReminderDatabase(str(path), clock=clock)
+    with sqlite3.connect(db.db_path) as conn:
+        conn.executemany(
+            "INSERT INTO reminders (message, scheduled_time, duration) VALUES (?, ?, ?)",
+            [("x" * 200, "2026-10-20 09:00:00", "5m")] * rows,
+        )
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute("DELETE FROM reminders WHERE id > 1")
+    return db
+
+
+def test_new_database_uses_incremental_auto_vacuum(tmp_path):
+    db = ReminderDatabase(str(tmp_path / "reminders.db"))
+    assert get_storage_stats(db)["auto_vacuum"] == "incremental"
+
+
+def test_incremental_vacuum_is_bounded(tmp_path):
+    db = make_churned_db(tmp_path / "reminders.db", VirtualClock(START))
+    before = get_storage_stats(db)
+    assert before["freelist_count"] > VACUUM_STEP_PAGES
+
+    ran = {task: result for task, _, result in run_maintenance(db)}
+
+    left = before["freelist_count"] - VACUUM_STEP_PAGES
+    assert ran["incremental_vacuum"] == f"freed {VACUUM_STEP_PAGES} page(s), {left} left"
+    assert get_storage_stats(db)["page_count"] == before["page_count"] - VACUUM_STEP_PAGES
+
+
+def test_existing_database_is_converted(tmp_path):
+    path = tmp_path / "old.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE reminders (id INTEGER PRIMARY KEY AUTOINCREMENT, message TEXT NOT NULL, "
+                     "scheduled_time TIMESTAMP, last_shown TIMESTAMP, status TEXT DEFAULT 'active', "
+                     "snooze_until TIMESTAMP, duration TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    db = ReminderDatabase(str(path), clock=VirtualClock(START))
+    assert get_storage_stats(db)["auto_vacuum"] == "none"
+
+    run_maintenance(db)
+
+    assert get_storage_stats(db)["auto_vacuum"] == "incremental"
+
+
+def test_tasks_run_only_when_due(tmp_path):
+    clock = VirtualClock(START)
+    db = ReminderDatabase(str(tmp_path / "reminders.db"), clock=clock)
+
+    assert [task for task, _, _ in run_maintenance(db)] == [
+        "purge_tombstones", "incremental_vacuum", "optimize", "analyze", "integrity_check", "size_budget",
+    ]
+    assert run_maintenance(db) == []
+
+    clock.sleep(2 * 60 * 60)
+    assert [task for task, _, _ in run_maintenance(db)] == ["incremental_vacuum"]
+
+    clock.sleep(24 * 60 * 60)
+    assert [task for task, _, _ in run_maintenance(db)] == ["incremental_vacuum", "optimize", "size_budget"]
+
+    assert len(run_maintenance(db, force=True)) == 6
+
+
+def test_size_budget_runs_full_vacuum(tmp_path):
+    db = make_churned_db(tmp_path / "reminders.db", VirtualClock(START))
+    ran = {task: result for task, _, result in run_maintenance(db, size_budget=64 * 1024)}
+    assert ran["size_budget"].startswith("vacuumed to")
+    assert get_storage_stats(db)["freelist_count"] == 0
+
+
+def test_integrity_failure_raises(tmp_path, monkeypatch):
+    import maintenance
+    db = ReminderDatabase(str(tmp_path / "reminders.db"), clock=VirtualClock(START))
+    monkeypatch.setitem(maintenance.TASKS, "integrity_check", lambda conn, now, size_budget: "page 3 is never used")
+    with pytest.raises(RuntimeError):
+        run_maintenance(db)
+
+
+def test_report_lists_every_step(tmp_path):
+    db = ReminderDatabase(str(tmp_path / "reminders.db"), clock=VirtualClock(START))
+    run_maintenance(db)
+    report = "\n".join(format_report(db))
+    assert "Freelist pages:" in report
+    assert len(get_maintenance_log(db)) == 6
+    for task in ("purge_tombstones", "incremental_vacuum", "optimize", "analyze", "integrity_check", "size_budget"):
+        assert f"{task:<20} 2026-10-19 09:00:00" in report
+
+
+def test_purge_tombstones_after_retention(tmp_path):
+    clock = VirtualClock(START)
+    db = ReminderDatabase(str(tmp_path / "reminders.db"), clock=clock)
+    for message in ("Old", "Recent", "Kept"):
+        db.add_reminder(message, "2026-10-20 09:00:00", "5m")
+    db.remove_reminder(1)
+    clock.sleep(80 * 24 * 60 * 60)
+    db.remove_reminder(2)
+    clock.sleep(20 * 24 * 60 * 60)
+
+    ran = {task: result for task, _, result in run_maintenance(db)}
+
+    assert ran["purge_tombstones"] == "purged 1 tombstone(s)"
+    with sqlite3.connect(db.db_path) as conn:
+        assert conn.execute("SELECT id, deleted FROM reminders ORDER BY id").fetchall() == [(2, 1), (3, 0)]
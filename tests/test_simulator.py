@@ -0,0 +1,106 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+from clock import VirtualClock
+from database import ReminderDatabase
+from reminder_daemon import next_occurrence
+from simulator import simulate, ScriptedNotifier
+
+START = datetime(2026, 10, 19, 9, 0, 0)
+
+
+def make_db(tmp_path, reminders):
+    """Create a database holding (message, scheduled_time, duration) reminders."""
+    db = ReminderDatabase(str(tmp_path / "reminders.db"))
+    for message, scheduled_time, duration in reminders:
+        db.add_reminder(message, scheduled_time.strftime("%Y-%m-%d %H:%M:%S"), duration)
+    return db
+
+
+def test_virtual_clock_sleep_advances_time():
+    clock = VirtualClock(START)
+    clock.sleep(90)
+    assert clock.now() == START + timedelta(seconds=90)
+    clock.advance_to(START)
+    assert clock.now() == START + timedelta(seconds=90)
+
+
+def test_next_occurrence():
+    assert next_occurrence("5m", START) == START + timedelta(minutes=5)
+    assert next_occurrence("2h", START) == START + timedelta(hours=2)
+    assert next_occurrence("10:30", START) == datetime(2026, 10, 19, 10, 30)
+    assert next_occurrence("08:00", START) == datetime(2026, 10, 20, 8, 0)
+
+
+def test_database_uses_injected_clock(tmp_path):
+    db = make_db(tmp_path, [("Stretch", START + timedelta(minutes=10), "10m")])
+    db.clock = VirtualClock(START)
+    assert db.get_active_reminders() == []
+    assert db.get_next_due_time() == "2026-10-19 09:10:00"
+    db.clock.sleep(600)
+    assert len(db.get_active_reminders()) == 1
+
+
+def test_simulate_repeat_timeline(tmp_path):
+    db = make_db(tmp_path, [("Drink water", START + timedelta(minutes=45), "45m")])
+    timeline = simulate(db.db_path, START, START + timedelta(hours=3))
+    assert [moment for moment, _, _, _ in timeline] == [
+        START + timedelta(minutes=45),
+        START + timedelta(minutes=90),
+        START + timedelta(minutes=135),
+        START + timedelta(minutes=180),
+    ]
+    assert all(action == "repeat" for _, _, _, action in timeline)
+
+
+def test_simulate_fires_on_next_poll_tick(tmp_path):
+    db = make_db(tmp_path, [("Call back", START + timedelta(seconds=70), "5m")])
+    timeline = simulate(db.db_path, START, START + timedelta(minutes=3), ScriptedNotifier("stop"))
+    assert timeline == [(START + timedelta(seconds=90), 1, "Call back", "stop")]
+
+
+def test_simulate_scripted_snooze_then_stop(tmp_path):
+    db = make_db(tmp_path, [("Stand up", START + timedelta(minutes=1), "1h")])
+    notifier = ScriptedNotifier("stop", script={"Stand up": ["snooze", "snooze"]})
+    timeline = simulate(db.db_path, START, START + timedelta(days=1), notifier)
+    assert [(moment, action) for moment, _, _, action in timeline] == [
+        (START + timedelta(minutes=1), "snooze"),
+        (START + timedelta(minutes=6), "snooze"),
+        (START + timedelta(minutes=11), "stop"),
+    ]
+
+
+def test_simulate_does_not_modify_source_database(tmp_path):
+    db = make_db(tmp_path, [("Lunch", START + timedelta(hours=3), "12:00")])
+    before = os.path.getmtime(db.db_path), db.get_all_reminders()
+    simulate(db.db_path, START, START + timedelta(days=7), ScriptedNotifier("stop"))
+    assert (os.path.getmtime(db.db_path), db.get_all_reminders()) == before
+
+
+def test_simulate_fixed_speed_matches_max_speed(tmp_path):
+    db = make_db(tmp_path, [
+        ("Email", START + timedelta(minutes=2), "5m"),
+        ("Review", START + timedelta(minutes=7), "10:00"),
+    ])
+    end = START + timedelta(hours=1)
+    assert simulate(db.db_path, START, end, speed=1e9) == simulate(db.db_path, START, end)
+
+
+def test_simulate_with_sub_second_start(tmp_path):
+    db = make_db(tmp_path, [("Stretch", START + timedelta(minutes=5), "5m")])
+    timeline = simulate(db.db_path, START + timedelta(microseconds=500000), START + timedelta(hours=1))
+    assert [moment for moment, rid, message, action in timeline] == [START + timedelta(minutes=5 * i) for i in range(1, 13)]
+
+
+def test_simulate_copies_only_committed_changes(tmp_path):
+    db = make_db(tmp_path, [("Lunch", START + timedelta(hours=3), "12:00")])
+    writer = sqlite3.connect(db.db_path)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO reminders (message, scheduled_time, duration) VALUES ('Half written', '2026-10-19 09:30:00', '5m')")
+    try:
+        timeline = simulate(db.db_path, START, START + timedelta(hours=4), ScriptedNotifier("stop"))
+    finally:
+        writer.rollback()
+        writer.close()
+    assert [message for moment, rid, message, action in timeline] == ["Lunch"]
@@ -0,0 +1,79 @@
+import json
+from datetime import datetime
+
+from clock import VirtualClock
+from reminder_daemon import run_daemon
+from soak import HeadlessNotifier, create_synthetic_store, run_soak, write_report, format_report
+
+
+def test_headless_notifier_cycles_actions():
+    notifier = HeadlessNotifier(("repeat", "stop"))
+    assert [notifier("m", "5m", None, None) for _ in range(3)] == ["repeat", "stop", "repeat"]
+    assert notifier.shown == 3
+    assert notifier.stopped == 1
+
+
+def test_run_daemon_stops_after_max_ticks(tmp_path):
+    clock = VirtualClock(datetime(2026, 1, 5, 8, 0, 0))
+    db = create_synthetic_store(str(tmp_path / "soak.db"), 10, clock)
+    notifier = HeadlessNotifier(("stop",))
+    ticks = []
+    errors = []
+
+    run_daemon(clock=clock, notifier=notifier, db_path=db.db_path, on_error=lambda title, message: errors.append(message),
+               max_ticks=2880, on_tick=ticks.append)
+
+    assert errors == []
+    assert ticks == list(range(1, 2881))
+    assert clock.now() == datetime(2026, 1, 6, 8, 0, 0)
+    assert notifier.shown == 10
+    assert db.get_all_reminders() == []
+
+
+def test_run_daemon_reports_errors_and_keeps_going(tmp_path):
+    clock = VirtualClock(datetime(2026, 1, 5, 8, 0, 0))
+    errors = []
+
+    run_daemon(clock=clock, notifier=HeadlessNotifier(), db_path=str(tmp_path / "missing" / "soak.db"),
+               on_error=lambda title, message: errors.append(title), max_ticks=3)
+
+    assert errors == ["Reminder Daemon Error"] * 3
+
+
+def test_run_daemon_reports_failing_reminders(tmp_path):
+    clock = VirtualClock(datetime(2026, 1, 5, 8, 0, 0))
+    db = create_synthetic_store(str(tmp_path / "soak.db"), 3, clock)
+    failed = []
+
+    def broken_notifier(message, duration, last_shown, scheduled_time):
+        raise RuntimeError("dialog failed")
+
+    run_daemon(clock=clock, notifier=broken_notifier, db_path=db.db_path, on_error=lambda title, message: None,
+               max_ticks=2880, on_reminder_error=lambda reminder, error: failed.append((reminder[0], str(error))))
+
+    # A failing reminder stays due, so it is reported again on every poll
+    assert set(failed) == {(1, "dialog failed"), (2, "dialog failed"), (3, "dialog failed")}
+
+
+def test_soak_passes_within_budget(tmp_path):
+    report = run_soak(ticks=600, reminders=20, samples=4)
+
+    assert report["passed"]
+    assert report["reminders_shown"] > 0
+    assert [sample["tick"] for sample in report["samples"]] == [100, 225, 350, 475, 600]
+    assert report["growth"]["open_handles"] <= 0
+    assert report["growth"]["errors"] == 0
+    assert {sample["reminders"] for sample in report["samples"]} == {20}
+
+    path = tmp_path / "soak_report.json"
+    write_report(report, str(path))
+    assert json.loads(path.read_text())["config"]["ticks"] == 600
+    assert format_report(report)[-1] == "PASSED: all growth within budget"
+
+
+def test_soak_fails_over_budget():
+    report = run_soak(ticks=200, reminders=5, samples=2, budget={"rss_mb": -1.0})
+
+    assert not report["passed"]
+    assert report["over_budget"] == ["rss_mb"]
+    assert format_report(report)[-1] == "FAILED: over budget: rss_mb"
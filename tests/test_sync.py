@@ -0,0 +1,196 @@
+import shutil
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from clock import VirtualClock
+from database import ReminderDatabase
+from sync import sync_databases, resolve_sync_path
+
+START = datetime(2026, 10, 19, 9, 0, 0)
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock(START)
+
+
+@pytest.fixture
+def laptop(tmp_path, clock):
+    return ReminderDatabase(str(tmp_path / "laptop.db"), clock=clock)
+
+
+@pytest.fixture
+def workstation(tmp_path, clock):
+    return ReminderDatabase(str(tmp_path / "workstation.db"), clock=clock)
+
+
+def messages(db):
+    return sorted(reminder[1] for reminder in db.get_all_reminders())
+
+
+def test_sync_exchanges_new_reminders(laptop, workstation):
+    laptop.add_reminder("Water plants", "2026-10-19 18:00:00", "18:00")
+    workstation.add_reminder("Standup", "2026-10-19 10:30:00", "10:30")
+
+    assert sync_databases(laptop, workstation) == (1, 1)
+
+    assert messages(laptop) == messages(workstation) == ["Standup", "Water plants"]
+
+
+def test_sync_only_sends_changes_since_last_sync(laptop, workstation):
+    for i in range(50):
+        laptop.add_reminder(f"Reminder {i}", "2026-10-19 18:00:00", "1h")
+    sync_databases(laptop, workstation)
+
+    assert sync_databases(laptop, workstation) == (0, 0)
+
+    laptop.update_reminder_status(3, "snoozed")
+    assert sync_databases(laptop, workstation) == (0, 1)
+    assert sync_databases(laptop, workstation) == (0, 0)
+
+
+def test_sync_does_not_send_received_rows_back(laptop, workstation):
+    laptop.add_reminder("Lunch", "2026-10-19 12:00:00", "12:00")
+    workstation.add_reminder("Commute", "2026-10-19 17:30:00", "17:30")
+    sync_databases(laptop, workstation)
+
+    # Each side's watermark already covers everything the other holds
+    for db, other in ((laptop, workstation), (workstation, laptop)):
+        with sqlite3.connect(db.db_path) as conn:
+            watermark = conn.execute("SELECT last_seq FROM sync_peers WHERE site_id = ?", (other.site_id,)).fetchone()[0]
+        with sqlite3.connect(other.db_path) as conn:
+            assert watermark == conn.execute("SELECT MAX(change_seq) FROM reminders").fetchone()[0]
+
+
+def test_sync_propagates_removal(laptop, workstation):
+    laptop.add_reminder("Call mum", "2026-10-19 18:00:00", "18:00")
+    sync_databases(laptop, workstation)
+
+    workstation.remove_reminder(1)
+    sync_databases(laptop, workstation)
+
+    assert laptop.get_all_reminders() == []
+    assert laptop.get_reminder_by_id(1) is None
+
+
+def test_conflict_latest_change_wins_on_both_sides(laptop, workstation, clock):
+    laptop.add_reminder("Review", "2026-10-19 18:00:00", "18:00")
+    sync_databases(laptop, workstation)
+
+    workstation.update_reminder_times(1, scheduled_time="2026-10-20 18:00:00")
+    clock.sleep(60)
+    laptop.update_reminder_times(1, scheduled_time="2026-10-21 18:00:00")
+    sync_databases(laptop, workstation)
+
+    assert laptop.get_reminder_by_id(1)[2] == workstation.get_reminder_by_id(1)[2] == "2026-10-21 18:00:00"
+
+
+def test_removal_loses_to_later_edit(laptop, workstation, clock):
+    laptop.add_reminder("Pay rent", "2026-10-19 18:00:00", "18:00")
+    sync_databases(laptop, workstation)
+
+    laptop.remove_reminder(1)
+    clock.sleep(60)
+    workstation.update_reminder_status(1, "snoozed")
+    sync_databases(workstation, laptop)
+
+    assert messages(laptop) == messages(workstation) == ["Pay rent"]
+
+
+def test_changes_pass_through_a_third_site(tmp_path, laptop, workstation, clock):
+    shared = ReminderDatabase(str(tmp_path / "shared.db"), clock=clock)
+    laptop.add_reminder("Backup", "2026-10-19 18:00:00", "24h")
+
+    sync_databases(laptop, shared)
+    sync_databases(workstation, shared)
+
+    assert messages(workstation) == ["Backup"]
+
+
+def test_sync_with_copied_file(tmp_path, laptop, clock):
+    laptop.add_reminder("Gym", "2026-10-19 18:00:00", "18:00")
+    shutil.copyfile(laptop.db_path, tmp_path / "copy.db")
+    copy = ReminderDatabase(str(tmp_path / "copy.db"), clock=clock)
+    copy.add_reminder("Dentist", "2026-10-20 09:00:00", "09:00")
+
+    assert sync_databases(laptop, copy) == (1, 0)
+    assert copy.site_id != laptop.site_id
+    assert messages(laptop) == messages(copy) == ["Dentist", "Gym"]
+
+
+def test_sync_with_itself_is_refused(laptop):
+    with pytest.raises(ValueError):
+        sync_databases(laptop, ReminderDatabase(laptop.db_path))
+
+
+def test_existing_reminders_get_the_same_uuid_in_copies(tmp_path, clock):
+    with sqlite3.connect(tmp_path / "old.db") as conn:
+        conn.execute("CREATE TABLE reminders (id INTEGER PRIMARY KEY AUTOINCREMENT, message TEXT NOT NULL, "
+                     "scheduled_time TIMESTAMP, last_shown TIMESTAMP, status TEXT DEFAULT 'active', "
+                     "snooze_until TIMESTAMP, duration TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO reminders (message, scheduled_time, duration) VALUES ('Old one', '2026-10-19 18:00:00', '18:00')")
+    shutil.copyfile(tmp_path / "old.db", tmp_path / "old_copy.db")
+
+    old = ReminderDatabase(str(tmp_path / "old.db"), clock=clock)
+    old_copy = ReminderDatabase(str(tmp_path / "old_copy.db"), clock=clock)
+    sync_databases(old, old_copy)
+
+    assert messages(old) == messages(old_copy) == ["Old one"]
+
+
+def test_removal_of_migrated_reminder_is_not_undone(tmp_path):
+    # created_at is written by SQLite in UTC, which can be later than the
+    # local time of the removal (e.g. in a timezone behind UTC)
+    with sqlite3.connect(tmp_path / "old.db") as conn:
+        conn.execute("CREATE TABLE reminders (id INTEGER PRIMARY KEY AUTOINCREMENT, message TEXT NOT NULL, "
+                     "scheduled_time TIMESTAMP, last_shown TIMESTAMP, status TEXT DEFAULT 'active', "
+                     "snooze_until TIMESTAMP, duration TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO reminders (message, scheduled_time, duration, created_at) "
+                     "VALUES ('Old one', '2026-10-19 18:00:00', '18:00', '2026-10-19 17:00:00')")
+    shutil.copyfile(tmp_path / "old.db", tmp_path / "old_copy.db")
+    clock = VirtualClock(datetime(2026, 10, 19, 9, 0, 0))
+
+    old = ReminderDatabase(str(tmp_path / "old.db"), clock=clock)
+    old_copy = ReminderDatabase(str(tmp_path / "old_copy.db"), clock=clock)
+    old.remove_reminder(1)
+
+    assert sync_databases(old, old_copy) == (0, 1)
+    assert old.get_all_reminders() == old_copy.get_all_reminders() == []
+
+
+def test_resolve_sync_path(tmp_path):
+    (tmp_path / "other.db").touch()
+    assert resolve_sync_path(str(tmp_path)) == str(tmp_path / ".reminders.db")
+    assert resolve_sync_path(str(tmp_path / "other.db")) == str(tmp_path / "other.db")
+
+
+def test_resolve_sync_path_refuses_missing_file_unless_created(tmp_path):
+    with pytest.raises(ValueError):
+        resolve_sync_path(str(tmp_path / "typo.db"))
+    assert resolve_sync_path(str(tmp_path / "new.db"), create=True) == str(tmp_path / "new.db")
+
+
+def test_change_seq_is_unique(laptop):
+    laptop.add_reminder("Water plants", "2026-10-19 18:00:00", "18:00")
+    with pytest.raises(sqlite3.IntegrityError):
+        with laptop._connect() as conn:
+            conn.execute("INSERT INTO reminders (message, uuid, change_seq) VALUES ('Copy', 'other', 1)")
+
+
+def test_duplicate_change_seqs_are_renumbered_on_upgrade(tmp_path, laptop, workstation, clock):
+    for message in ("Lunch", "Commute", "Gym"):
+        laptop.add_reminder(message, "2026-10-19 18:00:00", "18:00")
+    # A database written by a version whose index on change_seq was not unique
+    with sqlite3.connect(laptop.db_path) as conn:
+        conn.execute("DROP INDEX idx_reminders_change_seq")
+        conn.execute("CREATE INDEX idx_reminders_change_seq ON reminders (change_seq)")
+        conn.execute("UPDATE reminders SET change_seq = 2 WHERE id = 3")
+        conn.execute("PRAGMA user_version = 1")
+
+    upgraded = ReminderDatabase(laptop.db_path, clock=clock)
+
+    with sqlite3.connect(upgraded.db_path) as conn:
+        assert conn.execute("SELECT id, change_seq FROM reminders ORDER BY id").fetchall() == [(1, 1), (2, 2), (3, 3)]
+    assert sync_databases(upgraded, workstation) == (0, 3)